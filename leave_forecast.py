@@ -0,0 +1,194 @@
+"""
+Staffing-availability forecast.
+
+Projects, for every department and every day over the next N months, how many
+employees are expected to be available. Two sources are combined:
+
+- committed absences: approved requests, plus pending requests weighted by the
+  historical approval rate
+- a historical baseline: the share of working days each department has
+  historically spent on approved leave, per calendar month and leave type
+
+Known requests are a floor on absence, and the baseline is the typical total.
+The projection for each day is therefore the larger of the two. All per-day
+work is done with NumPy array operations. Intervals are spread over days with
+difference arrays instead of looping over dates.
+"""
+
+import calendar
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from main import LeaveManagementSystem
+
+DEFAULT_SHORTAGE_THRESHOLD = 0.8
+MAX_FORECAST_MONTHS = 36
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year = day.year + month_index // 12
+    month = month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _spread(n_rows: int, n_days: int, rows: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+            weights: np.ndarray) -> np.ndarray:
+    """Per-row daily totals of weighted [start, end] day intervals (inclusive, pre-clipped)"""
+    diff = np.zeros((n_rows, n_days + 1))
+    np.add.at(diff, (rows, starts), weights)
+    np.add.at(diff, (rows, ends + 1), -weights)
+    return np.cumsum(diff[:, :-1], axis=1)
+
+
+class StaffingForecast:
+    """Projected daily availability per department"""
+
+    def __init__(self, days: np.ndarray, departments: List[str], headcount: np.ndarray,
+                 committed: np.ndarray, baseline: np.ndarray, leave_types: List[str],
+                 historical_rates: np.ndarray, pending_weight: float):
+        self.days = days
+        self.departments = departments
+        self.headcount = headcount
+        self.committed = committed
+        self.baseline = baseline
+        self.leave_types = leave_types
+        # Share of working days on leave, indexed [department, leave type, month - 1]
+        self.historical_rates = historical_rates
+        self.pending_weight = pending_weight
+
+        self.working_days = np.is_busday(days)
+        self.expected_absent = np.maximum(committed, baseline)
+        self.available = headcount[:, None] - self.expected_absent
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = self.available / headcount[:, None]
+        self.availability = np.where(headcount[:, None] > 0, ratio, 1.0)
+
+    def short_staffed_weeks(self, threshold: float = DEFAULT_SHORTAGE_THRESHOLD,
+                            department: str = None) -> List[Dict]:
+        """Weeks in which a department's lowest working-day availability falls below threshold"""
+        if len(self.days) == 0:
+            return []
+
+        # Group days into Monday-based weeks and take each week's worst working day
+        first_monday = np.datetime64('1970-01-05')
+        week_ids = (self.days - first_monday).astype(np.int64) // 7
+        week_starts = np.flatnonzero(np.r_[True, week_ids[1:] != week_ids[:-1]])
+        masked = np.where(self.working_days, self.availability, np.inf)
+        weekly_min = np.minimum.reduceat(masked, week_starts, axis=1)
+        weekly_available = np.minimum.reduceat(
+            np.where(self.working_days, self.available, np.inf), week_starts, axis=1)
+
+        shortages = []
+        dept_rows, week_cols = np.nonzero(weekly_min < threshold)
+        for row, col in zip(dept_rows, week_cols):
+            if department and self.departments[row] != department:
+                continue
+            shortages.append({
+                'department': self.departments[row],
+                'week_start': str(first_monday + np.timedelta64(7 * int(week_ids[week_starts[col]]), 'D')),
+                'headcount': int(self.headcount[row]),
+                'min_available': round(float(weekly_available[row, col]), 1),
+                'availability': round(float(weekly_min[row, col]) * 100, 1),
+            })
+        shortages.sort(key=lambda s: (s['week_start'], s['department']))
+        return shortages
+
+
+def forecast_availability(leave_mgr: LeaveManagementSystem, months: int = 12, start: date = None,
+                          pending_weight: Optional[float] = None) -> StaffingForecast:
+    """Forecast daily staff availability per department for the next `months` months
+
+    pending_weight is the probability a pending request ends up approved; by
+    default it is the historical approved / (approved + rejected) ratio.
+    Raises ValueError if months is outside 1..MAX_FORECAST_MONTHS or a stored
+    date is not YYYY-MM-DD.
+    """
+    if not 1 <= months <= MAX_FORECAST_MONTHS:
+        raise ValueError(f"months must be between 1 and {MAX_FORECAST_MONTHS}, got {months}")
+    start = start or date.today()
+    horizon_start = np.datetime64(start, 'D')
+    days = np.arange(horizon_start, np.datetime64(_add_months(start, months), 'D'), dtype='datetime64[D]')
+    n_days = len(days)
+
+    # Departments and headcount
+    employees = leave_mgr.employees
+    departments = sorted({emp['department'] for emp in employees.values()})
+    dept_index = {dept: i for i, dept in enumerate(departments)}
+    emp_dept = {emp_id: dept_index[emp['department']] for emp_id, emp in employees.items()}
+    headcount = np.bincount(np.fromiter(emp_dept.values(), dtype=np.int64, count=len(emp_dept)),
+                            minlength=len(departments)).astype(float)
+
+    # Column-wise view of the requests that belong to known employees
+    leave_types = leave_mgr.policy.leave_types()
+    type_index = {leave_type: i for i, leave_type in enumerate(leave_types)}
+    req_dept, req_type, req_start, req_end, req_status, req_applied = [], [], [], [], [], []
+    for req in leave_mgr.iter_leave_requests():
+        if req['employee_id'] not in emp_dept:
+            continue
+        req_dept.append(emp_dept[req['employee_id']])
+        req_type.append(type_index.get(req['leave_type'], -1))
+        req_start.append(req['start_date'])
+        req_end.append(req['end_date'])
+        req_status.append(req['status'])
+        if req.get('applied_date'):
+            req_applied.append(req['applied_date'])
+    req_dept = np.array(req_dept, dtype=np.int64)
+    req_type = np.array(req_type, dtype=np.int64)
+    req_start = np.array(req_start, dtype='datetime64[D]')
+    req_end = np.array(req_end, dtype='datetime64[D]')
+    req_status = np.array(req_status, dtype=object)
+
+    approved = req_status == 'Approved'
+    pending = req_status == 'Pending'
+    if pending_weight is None:
+        decided = int(approved.sum() + (req_status == 'Rejected').sum())
+        pending_weight = float(approved.sum()) / decided if decided else 1.0
+
+    # Committed absences inside the horizon
+    committed_mask = (approved | pending) & (req_end >= horizon_start) & (req_start < horizon_start + np.timedelta64(n_days, 'D'))
+    if n_days and committed_mask.any():
+        starts = np.clip((req_start[committed_mask] - horizon_start).astype(np.int64), 0, n_days - 1)
+        ends = np.clip((req_end[committed_mask] - horizon_start).astype(np.int64), 0, n_days - 1)
+        weights = np.where(approved[committed_mask], 1.0, pending_weight)
+        committed = _spread(len(departments), n_days, req_dept[committed_mask], starts, ends, weights)
+    else:
+        committed = np.zeros((len(departments), n_days))
+    committed *= np.is_busday(days)
+
+    # Historical leave rates per department, leave type and calendar month. The
+    # observed period runs from the earliest join, application or leave date up
+    # to the horizon, so months without leave count as capacity too.
+    historical_rates = np.zeros((len(departments), len(leave_types), 12))
+    history_mask = approved & (req_type >= 0) & (req_start < horizon_start)
+    if history_mask.any():
+        known_dates = np.array([emp['join_date'] for emp in employees.values()] + req_applied,
+                               dtype='datetime64[D]')
+        hist_start = min(req_start[history_mask].min(), known_dates.min())
+        hist_days = np.arange(hist_start, horizon_start, dtype='datetime64[D]')
+        n_hist = len(hist_days)
+        starts = (req_start[history_mask] - hist_start).astype(np.int64)
+        ends = np.minimum((req_end[history_mask] - hist_start).astype(np.int64), n_hist - 1)
+        rows = req_dept[history_mask] * len(leave_types) + req_type[history_mask]
+        absent = _spread(len(departments) * len(leave_types), n_hist, rows, starts, ends,
+                         np.ones(len(rows)))
+        hist_busdays = np.is_busday(hist_days)
+        absent *= hist_busdays
+
+        month_of_day = hist_days.astype('datetime64[M]').astype(np.int64) % 12
+        month_onehot = np.zeros((n_hist, 12))
+        month_onehot[np.arange(n_hist), month_of_day] = 1.0
+        absent_by_month = (absent @ month_onehot).reshape(len(departments), len(leave_types), 12)
+        capacity = headcount[:, None] * (hist_busdays @ month_onehot)[None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            historical_rates = np.where(capacity[:, None, :] > 0,
+                                        absent_by_month / capacity[:, None, :], 0.0)
+
+    forecast_month = days.astype('datetime64[M]').astype(np.int64) % 12
+    baseline = (historical_rates.sum(axis=1)[:, forecast_month] * headcount[:, None]
+                * np.is_busday(days))
+
+    return StaffingForecast(days, departments, headcount, committed, baseline,
+                            leave_types, historical_rates, pending_weight)
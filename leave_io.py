@@ -0,0 +1,156 @@
+"""
+Streaming export and import of leave data.
+
+Records are read from and written to CSV or JSONL files one at a time, so the
+full history can be moved in and out of a LeaveManagementSystem without
+materializing it in memory. Paths ending in ``.gz`` are gzip-compressed
+automatically.
+"""
+
+import csv
+import gzip
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from main import LeaveManagementSystem
+
+# Column order for each dataset (also the CSV header)
+DATASET_FIELDS = {
+    'employees': ['id', 'name', 'department', 'position', 'email', 'phone',
+                  'join_date', 'leave_entitlement'],
+    'leave_requests': ['request_id', 'employee_id', 'employee_name', 'leave_type',
+                       'start_date', 'end_date', 'total_days', 'reason', 'status',
+                       'applied_date', 'approved_by', 'approved_date', 'comments'],
+    'leave_balance': ['employee_id', 'employee_name', 'leave_type', 'total_entitlement',
+                      'used_leaves', 'remaining_leaves', 'year'],
+}
+
+# CSV stores everything as text; these columns are converted back on import
+INT_FIELDS = {'leave_entitlement', 'total_days', 'total_entitlement',
+              'used_leaves', 'remaining_leaves', 'year'}
+NULLABLE_FIELDS = {'approved_by', 'approved_date', 'comments'}
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _check_dataset(dataset: str):
+    if dataset not in DATASET_FIELDS:
+        raise ValueError(f"Unknown dataset '{dataset}'. Choose from: {', '.join(DATASET_FIELDS)}")
+
+
+def _open(path: str, mode: str, compress: Optional[bool] = None):
+    """Open a text file, using gzip when requested or when the path ends in .gz"""
+    if compress is None:
+        compress = path.endswith(".gz")
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def _chunks(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Group an iterable into lists of at most `size` items"""
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_dataset(leave_mgr: LeaveManagementSystem, dataset: str) -> Iterator[Dict]:
+    """Yield the records of a dataset straight from the system"""
+    _check_dataset(dataset)
+    if dataset == 'employees':
+        return leave_mgr.iter_employees()
+    if dataset == 'leave_requests':
+        return leave_mgr.iter_leave_requests()
+    return leave_mgr.iter_leave_balance()
+
+
+def export_csv(leave_mgr: LeaveManagementSystem, dataset: str, path: str,
+               compress: Optional[bool] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Stream a dataset to a CSV file and return the number of rows written"""
+    _check_dataset(dataset)
+    fields = DATASET_FIELDS[dataset]
+    written = 0
+    with _open(path, "w", compress) as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for chunk in _chunks(iter_dataset(leave_mgr, dataset), chunk_size):
+            writer.writerows(chunk)
+            written += len(chunk)
+    return written
+
+
+def export_jsonl(leave_mgr: LeaveManagementSystem, dataset: str, path: str,
+                 compress: Optional[bool] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Stream a dataset to a JSON Lines file and return the number of rows written"""
+    _check_dataset(dataset)
+    written = 0
+    with _open(path, "w", compress) as f:
+        for chunk in _chunks(iter_dataset(leave_mgr, dataset), chunk_size):
+            f.write("".join(json.dumps(record) + "\n" for record in chunk))
+            written += len(chunk)
+    return written
+
+
+def iter_csv(path: str, compress: Optional[bool] = None) -> Iterator[Dict]:
+    """Yield records from a CSV export, restoring numeric and empty fields"""
+    with _open(path, "r", compress) as f:
+        for row in csv.DictReader(f):
+            for key, value in row.items():
+                if key in INT_FIELDS and value:
+                    # Values that are not numbers are left for the loader to reject
+                    try:
+                        row[key] = int(value)
+                    except ValueError:
+                        pass
+                elif key in NULLABLE_FIELDS and value == "":
+                    row[key] = None
+            yield row
+
+
+def iter_jsonl(path: str, compress: Optional[bool] = None) -> Iterator[Dict]:
+    """Yield records from a JSON Lines export"""
+    with _open(path, "r", compress) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def import_records(leave_mgr: LeaveManagementSystem, dataset: str, records: Iterable[Dict],
+                   batch_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[int, int]:
+    """Insert records into the system in batches
+
+    Returns (loaded, rejected). Invalid rows are skipped one by one and
+    reported with their row number; the rest of their batch is still loaded.
+    """
+    _check_dataset(dataset)
+    if dataset == 'employees':
+        load = leave_mgr.load_employees
+    elif dataset == 'leave_requests':
+        load = leave_mgr.load_leave_requests
+    else:
+        load = leave_mgr.load_leave_balances
+
+    loaded = rejected = 0
+    row = 1
+    for batch in _chunks(records, batch_size):
+        batch_loaded, batch_rejected = load(batch, first_row=row)
+        loaded += batch_loaded
+        rejected += batch_rejected
+        row += len(batch)
+    return loaded, rejected
+
+
+def import_csv(leave_mgr: LeaveManagementSystem, dataset: str, path: str,
+               compress: Optional[bool] = None, batch_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[int, int]:
+    """Stream a CSV export back into the system; returns (loaded, rejected)"""
+    return import_records(leave_mgr, dataset, iter_csv(path, compress), batch_size)
+
+
+def import_jsonl(leave_mgr: LeaveManagementSystem, dataset: str, path: str,
+                 compress: Optional[bool] = None, batch_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[int, int]:
+    """Stream a JSON Lines export back into the system; returns (loaded, rejected)"""
+    return import_records(leave_mgr, dataset, iter_jsonl(path, compress), batch_size)
@@ -0,0 +1,105 @@
+"""
+Data-driven leave policy registry.
+
+Leave types, their entitlements, eligibility rules and per-department
+overrides are read from a JSON file (leave_policy.json by default) instead of
+being hard-coded. Each leave type entry supports:
+
+- name: display name, e.g. "Annual Leave"
+- entitlement: days per year, or "employee" to use the employee's own
+  leave_entitlement
+- department_overrides: {department: days} replacing the entitlement
+- eligible_departments: only these departments may take the leave
+- min_service_days: days since join_date before the leave becomes available
+"""
+
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+DEFAULT_POLICY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "leave_policy.json")
+
+
+class LeavePolicy:
+    """Rules for a single leave type"""
+
+    __slots__ = ('name', 'entitlement', 'department_overrides',
+                 'eligible_departments', 'min_service_days')
+
+    def __init__(self, name: str, entitlement, department_overrides: Dict[str, int] = None,
+                 eligible_departments: List[str] = None, min_service_days: int = 0):
+        self.name = name
+        self.entitlement = entitlement
+        self.department_overrides = department_overrides or {}
+        self.eligible_departments = set(eligible_departments) if eligible_departments else None
+        self.min_service_days = min_service_days
+
+    def is_eligible(self, employee: Dict, on_date: date = None) -> bool:
+        """Check whether an employee may take this leave type"""
+        if self.eligible_departments is not None and employee['department'] not in self.eligible_departments:
+            return False
+        if self.min_service_days:
+            on_date = on_date or date.today()
+            joined = datetime.strptime(employee['join_date'], "%Y-%m-%d").date()
+            if (on_date - joined).days < self.min_service_days:
+                return False
+        return True
+
+    def entitlement_for(self, employee: Dict) -> int:
+        """Days per year this employee is entitled to"""
+        if employee['department'] in self.department_overrides:
+            return self.department_overrides[employee['department']]
+        if self.entitlement == "employee":
+            return employee['leave_entitlement']
+        return self.entitlement
+
+
+class PolicyRegistry:
+    """Ordered collection of leave policies keyed by leave type name"""
+
+    def __init__(self, policies: List[LeavePolicy]):
+        self._policies = {policy.name: policy for policy in policies}
+        self._by_folded_name = {self._fold(name): name for name in self._policies}
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "PolicyRegistry":
+        """Build a registry from a parsed policy config"""
+        policies = []
+        for entry in config['leave_types']:
+            policies.append(LeavePolicy(
+                name=entry['name'],
+                entitlement=entry['entitlement'],
+                department_overrides=entry.get('department_overrides'),
+                eligible_departments=entry.get('eligible_departments'),
+                min_service_days=entry.get('min_service_days', 0),
+            ))
+        return cls(policies)
+
+    @classmethod
+    def load(cls, path: str = None) -> "PolicyRegistry":
+        """Load a registry from a JSON policy file"""
+        with open(path or DEFAULT_POLICY_PATH, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def leave_types(self) -> List[str]:
+        """Names of all configured leave types"""
+        return list(self._policies)
+
+    def resolve(self, leave_type: str) -> Optional[str]:
+        """Canonical name for a leave type given in any case, or None if unknown"""
+        return self._by_folded_name.get(self._fold(leave_type))
+
+    @staticmethod
+    def _fold(leave_type: str) -> str:
+        return " ".join(leave_type.split()).casefold()
+
+    def get(self, leave_type: str) -> Optional[LeavePolicy]:
+        """Policy for a leave type, or None if it is not configured"""
+        return self._policies.get(leave_type)
+
+    def __iter__(self):
+        return iter(self._policies.values())
+
+    def __contains__(self, leave_type: str) -> bool:
+        return leave_type in self._policies
@@ -0,0 +1,255 @@
+"""
+Memory and allocation profiling for LeaveManagementSystem.
+
+Two tools are provided:
+
+- AllocationProfiler wraps the methods of a live system and keeps per-method
+  call counts plus the net and peak bytes allocated (via tracemalloc). It is
+  switched on with LEAVE_PROFILE=1 or LeaveManagementSystem.enable_profiling().
+- profile_scale() builds synthetic systems of increasing size and reports bytes
+  per employee, bytes per request, per-method allocation counters for the read
+  paths and the top allocation sites.
+"""
+
+import contextlib
+import functools
+import gc
+import inspect
+import io
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+from main import LeaveManagementSystem
+
+DEFAULT_SCALES = [100, 1000]
+DEFAULT_TOP = 10
+TRACEBACK_FRAMES = 1
+
+
+class AllocationProfiler:
+    """Per-method allocation counters backed by tracemalloc"""
+
+    def __init__(self):
+        self.stats = {}
+        self._depth = 0
+        self._instrumented = {}
+        self._started_tracing = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEBACK_FRAMES)
+            self._started_tracing = True
+
+    def stop(self):
+        """Stop tracemalloc, unless someone else started it"""
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+
+    def reset(self):
+        self.stats = {}
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Return func wrapped so each call updates the counters for `name`"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracemalloc.is_tracing():
+                return func(*args, **kwargs)
+
+            # Only the outermost call owns the peak; nested calls would reset it
+            outermost = self._depth == 0
+            if outermost:
+                tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            self._depth += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                current, peak = tracemalloc.get_traced_memory()
+                stat = self.stats.setdefault(name, {'calls': 0, 'net_bytes': 0, 'peak_bytes': 0})
+                stat['calls'] += 1
+                stat['net_bytes'] += current - before
+                if outermost:
+                    stat['peak_bytes'] = max(stat['peak_bytes'], peak - before)
+        return wrapper
+
+    def instrument(self, obj, method_names: List[str] = None):
+        """Replace methods on an instance with counting wrappers
+
+        By default every public method is wrapped. Generator methods (including
+        context managers) are skipped because their work happens after the call
+        returns.
+        """
+        if method_names is None:
+            method_names = [
+                name for name, member in inspect.getmembers(type(obj), inspect.isfunction)
+                if not name.startswith('_') and not inspect.isgeneratorfunction(inspect.unwrap(member))
+            ]
+        names = self._instrumented.setdefault(id(obj), set())
+        for name in method_names:
+            if name not in names:
+                setattr(obj, name, self.wrap(name, getattr(obj, name)))
+                names.add(name)
+
+    def uninstrument(self, obj):
+        """Remove the wrappers added by instrument(), restoring the original methods"""
+        for name in self._instrumented.pop(id(obj), ()):
+            obj.__dict__.pop(name, None)
+
+    def report(self) -> List[Dict]:
+        """Counters per method, heaviest peak first
+
+        net_bytes includes the value each call returned, since it is still alive
+        when the call is measured.
+        """
+        rows = [dict(method=name, **stat) for name, stat in self.stats.items()]
+        rows.sort(key=lambda row: row['peak_bytes'], reverse=True)
+        return rows
+
+
+def top_allocation_sites(snapshot, baseline=None, top: int = DEFAULT_TOP) -> List[Dict]:
+    """Largest allocation sites by line, optionally relative to a baseline snapshot
+
+    Allocations made by tracemalloc and by this module (e.g. the synthetic
+    records) are left out so the sites point at the code being profiled.
+    """
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    snapshot = snapshot.filter_traces(filters)
+    if baseline is not None:
+        stats = [s for s in snapshot.compare_to(baseline.filter_traces(filters), 'lineno') if s.size_diff > 0]
+        return [{'site': str(s.traceback[0]), 'bytes': s.size_diff, 'count': s.count_diff}
+                for s in stats[:top]]
+    return [{'site': str(s.traceback[0]), 'bytes': s.size, 'count': s.count}
+            for s in snapshot.statistics('lineno')[:top]]
+
+
+def _synthetic_employees(count: int):
+    departments = ["IT", "HR", "SEO", "Marketing", "Finance", "Sales"]
+    for n in range(count):
+        employee_id = f"SYN{n:07d}"
+        yield {
+            'id': employee_id,
+            'name': f"employee {n}",
+            'department': departments[n % len(departments)],
+            'position': "Staff",
+            'email': f"{employee_id.lower()}@example.com",
+            'phone': "000-000-0000",
+            'join_date': "2020-01-01",
+            'leave_entitlement': 25
+        }
+
+
+def _synthetic_requests(employees: int, per_employee: int, leave_types: List[str]):
+    start = date(date.today().year, 1, 1)
+    statuses = ["Approved", "Pending", "Rejected"]
+    for n in range(employees * per_employee):
+        first_day = start + timedelta(days=n % 360)
+        yield {
+            'request_id': f"LR{n + 1:03d}",
+            'employee_id': f"SYN{n % employees:07d}",
+            'employee_name': f"employee {n % employees}",
+            'leave_type': leave_types[n % len(leave_types)],
+            'start_date': first_day.strftime("%Y-%m-%d"),
+            'end_date': (first_day + timedelta(days=n % 3)).strftime("%Y-%m-%d"),
+            'total_days': n % 3 + 1,
+            'reason': "synthetic",
+            'status': statuses[n % len(statuses)],
+            'applied_date': start.strftime("%Y-%m-%d"),
+            'approved_by': None,
+            'approved_date': None,
+            'comments': None
+        }
+
+
+def profile_scale(scales: List[int] = None, requests_per_employee: int = 2, top: int = DEFAULT_TOP,
+                  workload: Dict[str, Callable] = None) -> List[Dict]:
+    """Measure memory growth and read-path allocations at each synthetic scale
+
+    workload maps extra names to callables taking the system, e.g. MCP output
+    formatting, which are counted alongside the built-in read methods. If
+    tracemalloc is already running (e.g. a live profiler), it is left running.
+    """
+    started_tracing = False
+    results = []
+    try:
+        for employees in scales or DEFAULT_SCALES:
+            with contextlib.redirect_stdout(io.StringIO()):
+                leave_mgr = LeaveManagementSystem()
+            # LEAVE_PROFILE would instrument the synthetic system too
+            leave_mgr.disable_profiling()
+            requests = employees * requests_per_employee
+
+            gc.collect()
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEBACK_FRAMES)
+                started_tracing = True
+            empty = tracemalloc.take_snapshot()
+            before = tracemalloc.get_traced_memory()[0]
+            # Collect after each load so transaction garbage isn't counted as retained
+            leave_mgr.load_employees(_synthetic_employees(employees))
+            gc.collect()
+            after_employees = tracemalloc.get_traced_memory()[0]
+            leave_mgr.load_leave_requests(
+                _synthetic_requests(employees, requests_per_employee, leave_mgr.policy.leave_types()))
+            gc.collect()
+            after_requests = tracemalloc.get_traced_memory()[0]
+            loaded = tracemalloc.take_snapshot()
+
+            profiler = AllocationProfiler()
+            profiler.instrument(leave_mgr, ['get_leave_requests', 'get_leave_balance',
+                                            'get_employee_list', 'get_leave_summary'])
+            leave_mgr.get_leave_requests()
+            leave_mgr.get_leave_requests(status="Approved")
+            leave_mgr.get_leave_balance()
+            leave_mgr.get_employee_list()
+            leave_mgr.get_leave_summary()
+            for name, call in (workload or {}).items():
+                profiler.wrap(name, call)(leave_mgr)
+
+            results.append({
+                'employees': employees,
+                'requests': requests,
+                'bytes_per_employee': round((after_employees - before) / employees, 1) if employees else 0,
+                'bytes_per_request': round((after_requests - after_employees) / requests, 1) if requests else 0,
+                'methods': profiler.report(),
+                'top_sites': top_allocation_sites(loaded, empty, top),
+            })
+
+            del leave_mgr, profiler, empty, loaded
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return results
+
+
+def format_profile(results: List[Dict]) -> str:
+    """Plain-text rendering of profile_scale() output"""
+    lines = []
+    for result in results:
+        lines.append(f"Scale: {result['employees']} employees, {result['requests']} requests")
+        lines.append(f"  Bytes per employee: {result['bytes_per_employee']}")
+        lines.append(f"  Bytes per request: {result['bytes_per_request']}")
+        lines.append("  Method allocations (calls / net bytes / peak bytes):")
+        for row in result['methods']:
+            lines.append(f"    {row['method']}: {row['calls']} / {row['net_bytes']} / {row['peak_bytes']}")
+        lines.append("  Top allocation sites:")
+        for site in result['top_sites']:
+            lines.append(f"    {site['site']}: {site['bytes']} bytes in {site['count']} blocks")
+        lines.append("")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Profile LeaveManagementSystem memory at synthetic scales")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help="comma-separated employee counts")
+    parser.add_argument("--requests-per-employee", type=int, default=2)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    print(format_profile(profile_scale(scales, args.requests_per_employee, args.top)))
@@ -0,0 +1,200 @@
+"""
+Transactions and durable journaling for the leave management system.
+
+A Transaction records the before-image of every record it touches so a
+multi-step change (e.g. approving a request and deducting its balance) can be
+rolled back as one unit. Committed transactions are appended to a
+GroupCommitJournal, a JSON Lines file whose background writer batches all
+commits that arrive while the previous flush is in progress into a single
+write + fsync.
+"""
+
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class Transaction:
+    """Undo log for a single unit of work on the in-memory tables"""
+
+    def __init__(self):
+        self._undo = []
+        self._changes = []
+
+    # A dataset of None marks a change that is undone on rollback but not
+    # journaled, e.g. creating an employee's balance dict.
+
+    def record_update(self, dataset: str, record: Dict):
+        """Call before modifying an existing record in place"""
+        self._undo.append(('update', record, dict(record)))
+        if dataset is not None:
+            self._changes.append((dataset, lambda: record))
+
+    def record_insert(self, dataset: Optional[str], container: Dict, key: str):
+        """Call after adding container[key] as a new record"""
+        self._undo.append(('insert', container, key))
+        if dataset is not None:
+            record = container[key]
+            self._changes.append((dataset, lambda: record))
+
+    def record_set(self, dataset: Optional[str], container: Dict, key: str):
+        """Call before assigning container[key], whether or not it already exists"""
+        self._undo.append(('set', container, (key, key in container, container.get(key))))
+        if dataset is not None:
+            self._changes.append((dataset, lambda: container.get(key)))
+
+    def record_attr(self, obj, name: str):
+        """Call before assigning obj.<name>; the attribute is restored on rollback, not journaled"""
+        self._undo.append(('attr', obj, (name, getattr(obj, name))))
+
+    def rollback(self):
+        """Restore every touched record to its state before the transaction"""
+        for action, target, saved in reversed(self._undo):
+            if action == 'update':
+                target.clear()
+                target.update(saved)
+            elif action == 'insert':
+                target.pop(saved, None)
+            elif action == 'attr':
+                setattr(target, *saved)
+            else:
+                key, existed, previous = saved
+                if existed:
+                    target[key] = previous
+                else:
+                    target.pop(key, None)
+        self._undo = []
+        self._changes = []
+
+    def changes(self) -> List[Tuple[str, Dict]]:
+        """Post-images of the touched records, one entry per record"""
+        seen = set()
+        result = []
+        for dataset, current in reversed(self._changes):
+            record = current()
+            if record is not None and id(record) not in seen:
+                seen.add(id(record))
+                result.append((dataset, dict(record)))
+        result.reverse()
+        return result
+
+
+class GroupCommitJournal:
+    """Append-only JSON Lines journal with group commit"""
+
+    def __init__(self, path: str, valid_length: int = None):
+        """Open a journal for appending
+
+        valid_length is the offset returned by replay(); anything after it (a
+        commit torn by a crash) is cut off so new commits start on a clean line.
+        """
+        self.path = path
+        self.commits = 0
+        self.flushes = 0
+        if valid_length is not None and os.path.exists(path) and os.path.getsize(path) > valid_length:
+            os.truncate(path, valid_length)
+        self._file = open(path, "a", encoding="utf-8")
+        self._cond = threading.Condition()
+        self._pending = []
+        self._submitted = 0
+        self._durable = 0
+        self._error = None
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._writer.start()
+
+    @property
+    def durable(self) -> int:
+        """Highest ticket known to be on disk"""
+        with self._cond:
+            return self._durable
+
+    def check(self):
+        """Raise if a write has failed; the journal accepts nothing after that"""
+        if self._error is not None:
+            raise OSError(f"Journal {self.path} is unavailable after a write failure: {self._error}")
+
+    def submit(self, changes: List[Tuple[str, Dict]]) -> int:
+        """Queue a transaction's changes and return a ticket for wait()"""
+        line = json.dumps({'changes': changes}) + "\n"
+        with self._cond:
+            self.check()
+            if self._closed:
+                raise RuntimeError("Journal is closed")
+            self._pending.append(line)
+            self._submitted += 1
+            self._cond.notify_all()
+            return self._submitted
+
+    def wait(self, ticket: int):
+        """Block until the transaction with this ticket has been fsynced"""
+        with self._cond:
+            while self._durable < ticket and self._error is None:
+                self._cond.wait()
+            if self._durable < ticket:
+                self.check()
+
+    def append(self, changes: List[Tuple[str, Dict]]):
+        """Durably append one transaction"""
+        self.wait(self.submit(changes))
+
+    def close(self):
+        """Flush outstanding commits and stop the writer thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._file.close()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+                upto = self._submitted
+
+            try:
+                self._file.write("".join(batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                self._durable = upto
+                self.commits += len(batch)
+                self.flushes += 1
+                self._cond.notify_all()
+
+    @staticmethod
+    def replay(path: str, apply: Callable[[str, Dict], None]) -> int:
+        """Call apply(dataset, record) for each post-image in commit order
+
+        Returns the byte offset just past the last complete commit. A torn
+        final line means that commit never became durable and is ignored; a
+        bad line anywhere else is corruption and raises ValueError.
+        """
+        if not os.path.exists(path):
+            return 0
+        valid_length = 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    entry = json.loads(line)
+                except ValueError:
+                    if f.read(1):
+                        raise ValueError(f"Corrupt journal entry at byte {valid_length} in {path}")
+                    break
+                for dataset, record in entry['changes']:
+                    apply(dataset, record)
+                valid_length += len(line)
+        return valid_length
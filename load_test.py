@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Load-testing harness for the Leave Management MCP server.
+
+Starts mcp_server.py locally and drives it with concurrent simulated clients
+issuing a weighted mix of read and write tool calls, then reports throughput,
+latency percentiles and error rates. Everything runs on the local machine.
+
+    python load_test.py --transport stdio --clients 8 --calls-per-client 100
+    python load_test.py --transport http --clients 32 --mix apply_leave=3,view_leave_requests=5
+
+Over stdio all clients share one server process and session (the server is
+launched per session), so concurrency comes from overlapping requests. Over
+HTTP every client opens its own session against a single server process.
+Pass --max-error-rate / --max-p99-ms to exit non-zero when a threshold is
+exceeded, e.g. to gate a release.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+from fastmcp import Client
+from fastmcp.client.transports import PythonStdioTransport
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_server.py")
+
+DEFAULT_MIX = {
+    'view_leave_requests': 4,
+    'view_leave_balance': 3,
+    'view_employees': 1,
+    'get_leave_summary': 1,
+    'apply_leave': 3,
+    'approve_leave': 2,
+    'cancel_leave': 1,
+}
+
+WRITE_TOOLS = {'apply_leave', 'approve_leave', 'cancel_leave', 'add_employee'}
+
+LEAVE_TYPES = ["Annual Leave", "Sick Leave", "Personal Leave"]
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Parse 'tool=weight,tool=weight' into a dict"""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Workload:
+    """Generates tool calls and tracks state shared between simulated clients"""
+
+    def __init__(self, mix: Dict[str, int], employees_per_client: int, seed: int):
+        self.tools = list(mix)
+        self.weights = [mix[tool] for tool in self.tools]
+        self.employees_per_client = employees_per_client
+        self.random = random.Random(seed)
+        # Request IDs returned by apply_leave: not yet cancelled, per employee, and still pending
+        self.requests = {}
+        self.pending = []
+
+    def employee_ids(self, client_id: int) -> List[str]:
+        return [f"LT{client_id:03d}{n:03d}" for n in range(self.employees_per_client)]
+
+    def setup_calls(self, client_id: int):
+        """add_employee calls that give each client its own employees"""
+        for employee_id in self.employee_ids(client_id):
+            yield 'add_employee', {
+                'employee_id': employee_id,
+                'name': f"load-{employee_id}",
+                'department': self.random.choice(["IT", "HR", "SEO", "Marketing"]),
+                'position': "Tester",
+                'email': f"{employee_id.lower()}@example.com",
+                'phone': "000-000-0000",
+            }
+
+    def record_submitted(self, employee_id: str, request_id: str):
+        self.requests.setdefault(employee_id, []).append(request_id)
+        self.pending.append(request_id)
+
+    def _take(self, request_ids: List[str]) -> str:
+        return request_ids.pop(self.random.randrange(len(request_ids)))
+
+    def next_call(self, client_id: int):
+        tool = self.random.choices(self.tools, self.weights)[0]
+        employee_id = self.random.choice(self.employee_ids(client_id))
+
+        # Approve someone's pending request and cancel only this client's own requests;
+        # with nothing to act on yet, submit a request instead
+        if tool == 'approve_leave' and self.pending:
+            request_id = self._take(self.pending)
+            return tool, {
+                'request_id': request_id,
+                'approver': "Load Tester",
+                'status': self.random.choice(["Approved", "Approved", "Rejected"]),
+            }
+        if tool == 'cancel_leave':
+            owners = [emp for emp in self.employee_ids(client_id) if self.requests.get(emp)]
+            if owners:
+                employee_id = self.random.choice(owners)
+                request_id = self._take(self.requests[employee_id])
+                if request_id in self.pending:
+                    self.pending.remove(request_id)
+                return tool, {'request_id': request_id, 'employee_id': employee_id}
+        if tool in ('apply_leave', 'approve_leave', 'cancel_leave'):
+            start = date.today() + timedelta(days=self.random.randint(1, 365))
+            return 'apply_leave', {
+                'employee_id': employee_id,
+                'leave_type': self.random.choice(LEAVE_TYPES),
+                'start_date': start.strftime("%Y-%m-%d"),
+                'end_date': start.strftime("%Y-%m-%d"),
+                'reason': "load test",
+            }
+        if tool in ('view_leave_requests', 'view_leave_balance'):
+            return tool, {'employee_id': employee_id} if self.random.random() < 0.5 else {}
+        return tool, {}
+
+
+class Results:
+    """Latency samples and outcome counts per tool"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.rejected = {}
+        self.errors = {}
+        self.error_samples = []
+
+    def record(self, tool: str, seconds: float, rejected: bool = False, error: Exception = None):
+        self.latencies.setdefault(tool, []).append(seconds)
+        if rejected:
+            self.rejected[tool] = self.rejected.get(tool, 0) + 1
+        if error is not None:
+            self.errors[tool] = self.errors.get(tool, 0) + 1
+            if len(self.error_samples) < 5:
+                self.error_samples.append(f"{tool}: {error!r}")
+
+    def total_calls(self) -> int:
+        return sum(len(samples) for samples in self.latencies.values())
+
+    def error_rate(self) -> float:
+        total = self.total_calls()
+        return sum(self.errors.values()) / total if total else 0.0
+
+    def all_latencies(self) -> List[float]:
+        return sorted(s for samples in self.latencies.values() for s in samples)
+
+
+def _result_text(result) -> str:
+    """Text of a call_tool result across fastmcp versions"""
+    content = getattr(result, 'content', result)
+    return content[0].text if content else ""
+
+
+async def timed_call(client: Client, tool: str, arguments: Dict, results: Results, workload: Workload):
+    started = time.perf_counter()
+    try:
+        result = await client.call_tool(tool, arguments)
+    except Exception as e:
+        results.record(tool, time.perf_counter() - started, error=e)
+        return
+    elapsed = time.perf_counter() - started
+
+    # Tools report business-rule failures (e.g. insufficient balance) as text, not errors
+    if getattr(result, 'is_error', False):
+        results.record(tool, elapsed, error=RuntimeError(_result_text(result)))
+    else:
+        text = _result_text(result)
+        results.record(tool, elapsed, rejected=text.startswith("❌"))
+        match = re.search(r"\bLR\d+", text)
+        if tool == 'apply_leave' and text.startswith("✅") and match:
+            workload.record_submitted(arguments['employee_id'], match.group())
+
+
+async def setup_client(client: Client, client_id: int, workload: Workload):
+    for tool, arguments in workload.setup_calls(client_id):
+        await client.call_tool(tool, arguments)
+
+
+async def run_client(client: Client, client_id: int, calls: int, workload: Workload, results: Results):
+    for _ in range(calls):
+        tool, arguments = workload.next_call(client_id)
+        await timed_call(client, tool, arguments, results, workload)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited early with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server did not start listening on port {port}")
+
+
+async def run_load_test(args) -> tuple:
+    workload = Workload(parse_mix(args.mix) if args.mix else DEFAULT_MIX,
+                        args.employees_per_client, args.seed)
+    results = Results()
+    env = dict(os.environ)
+    if args.journal:
+        env['LEAVE_JOURNAL_PATH'] = args.journal
+
+    server = None
+    try:
+        if args.transport == "http":
+            port = args.port or _free_port()
+            server = subprocess.Popen(
+                [sys.executable, SERVER_SCRIPT, "--transport", "http", "--port", str(port)],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            _wait_for_port(port, server)
+            clients = [Client(f"http://127.0.0.1:{port}/mcp") for _ in range(args.clients)]
+        else:
+            transport = PythonStdioTransport(SERVER_SCRIPT, env=env)
+            clients = [Client(transport)]
+
+        # The exit stack closes clients already connected if a later one fails
+        async with contextlib.AsyncExitStack() as stack:
+            for client in clients:
+                await stack.enter_async_context(client)
+            # Employees are created before the clock starts
+            await asyncio.gather(*(setup_client(clients[i % len(clients)], i, workload)
+                                   for i in range(args.clients)))
+            started = time.perf_counter()
+            await asyncio.gather(*(run_client(clients[i % len(clients)], i, args.calls_per_client,
+                                              workload, results)
+                                   for i in range(args.clients)))
+            elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    return results, elapsed
+
+
+def print_report(results: Results, elapsed: float, args):
+    total = results.total_calls()
+    print("=" * 78)
+    print(f"Load test: {args.transport}, {args.clients} clients x {args.calls_per_client} calls")
+    print("=" * 78)
+    print(f"{'tool':<22}{'calls':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'reject':>7}{'error':>7}")
+    for tool in sorted(results.latencies):
+        samples = sorted(results.latencies[tool])
+        print(f"{tool:<22}{len(samples):>7}"
+              f"{percentile(samples, 50) * 1000:>9.2f}{percentile(samples, 95) * 1000:>9.2f}"
+              f"{percentile(samples, 99) * 1000:>9.2f}{samples[-1] * 1000:>9.2f}"
+              f"{results.rejected.get(tool, 0):>7}{results.errors.get(tool, 0):>7}")
+
+    overall = results.all_latencies()
+    writes = sum(len(s) for tool, s in results.latencies.items() if tool in WRITE_TOOLS)
+    print("-" * 78)
+    print(f"Total calls: {total} ({writes} writes) in {elapsed:.2f}s")
+    print(f"Throughput: {total / elapsed if elapsed else 0:.1f} calls/s")
+    print(f"Latency p50/p95/p99/max: {percentile(overall, 50) * 1000:.2f} / "
+          f"{percentile(overall, 95) * 1000:.2f} / {percentile(overall, 99) * 1000:.2f} / "
+          f"{(overall[-1] if overall else 0) * 1000:.2f} ms")
+    print(f"Rejected by business rules: {sum(results.rejected.values())}")
+    print(f"Error rate: {results.error_rate() * 100:.2f}%")
+    for sample in results.error_samples:
+        print(f"  {sample}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the Leave Management MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent simulated clients")
+    parser.add_argument("--calls-per-client", type=int, default=100)
+    parser.add_argument("--employees-per-client", type=int, default=5)
+    parser.add_argument("--mix", help="tool weights, e.g. apply_leave=3,view_leave_requests=5")
+    parser.add_argument("--port", type=int, help="HTTP port (default: a free port)")
+    parser.add_argument("--journal", help="LEAVE_JOURNAL_PATH for the server under test")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-error-rate", type=float, help="fail if error rate (0-1) exceeds this")
+    parser.add_argument("--max-p99-ms", type=float, help="fail if overall p99 latency exceeds this")
+    args = parser.parse_args(argv)
+
+    results, elapsed = asyncio.run(run_load_test(args))
+    print_report(results, elapsed, args)
+
+    failed = False
+    if args.max_error_rate is not None and results.error_rate() > args.max_error_rate:
+        print(f"FAIL: error rate above {args.max_error_rate * 100:.2f}%")
+        failed = True
+    p99_ms = percentile(results.all_latencies(), 99) * 1000
+    if args.max_p99_ms is not None and p99_ms > args.max_p99_ms:
+        print(f"FAIL: p99 latency {p99_ms:.2f} ms above {args.max_p99_ms:.2f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
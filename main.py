@@ -1,14 +1,153 @@
+import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+
+from leave_store import Transaction, GroupCommitJournal
+from leave_policy import PolicyRegistry
+
+# Fields a loaded record must carry, and which of them must be whole numbers
+EMPLOYEE_REQUIRED = ('id', 'name', 'department', 'join_date', 'leave_entitlement')
+# Contact fields the views display; a record without them loads with them blank
+EMPLOYEE_OPTIONAL = ('position', 'email', 'phone')
+REQUEST_REQUIRED = ('request_id', 'employee_id', 'employee_name', 'leave_type',
+                    'start_date', 'end_date', 'total_days', 'status')
+BALANCE_REQUIRED = ('employee_id', 'employee_name', 'leave_type', 'total_entitlement',
+                    'used_leaves', 'remaining_leaves', 'year')
+NUMERIC_FIELDS = ('leave_entitlement', 'total_days', 'total_entitlement',
+                  'used_leaves', 'remaining_leaves', 'year')
+# Dates are stored as YYYY-MM-DD; the forecast and summary parse them in that format
+DATE_FIELDS = ('join_date', 'start_date', 'end_date', 'applied_date', 'approved_date')
+
+def _is_iso_date(value) -> bool:
+    if not isinstance(value, str) or len(value) != 10:
+        return False
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+def _invalid_record_reason(record, required) -> Optional[str]:
+    """Why a loaded record cannot be used, or None if it is valid"""
+    if not isinstance(record, dict):
+        return "not a record"
+    for field in required:
+        value = record.get(field)
+        if value is None or value == "":
+            return f"missing '{field}'"
+        if field in NUMERIC_FIELDS and (not isinstance(value, int) or isinstance(value, bool)):
+            return f"'{field}' is not a whole number"
+    for field in DATE_FIELDS:
+        value = record.get(field)
+        if value is not None and value != "" and not _is_iso_date(value):
+            return f"'{field}' is not a YYYY-MM-DD date"
+    return None
 
 class LeaveManagementSystem:
-    def __init__(self):
-        """Initialize the leave management system with in-memory data"""
+    def __init__(self, journal_path: str = None, policy_path: str = None):
+        """Initialize the leave management system with in-memory data
+
+        If journal_path is given, committed changes are replayed from and
+        durably appended to that file. Leave types come from the policy file
+        at policy_path (leave_policy.json by default). Set LEAVE_PROFILE=1 to
+        record per-method allocation counters.
+        """
+        self.policy = PolicyRegistry.load(policy_path)
         self.employees = {}
         self.leave_requests = {}
+        # Only balances that have been used are stored; the rest are derived from the policy
         self.leave_balance = {}
         self.request_counter = 1
+        self._lock = threading.RLock()
+        self._journal = None
+        # Transactions applied in memory but not yet on disk, by journal ticket
+        self._unsynced = {}
+        self.profiler = None
+        if os.environ.get("LEAVE_PROFILE", "").lower() in ("1", "true", "yes"):
+            self.enable_profiling()
         self.initialize_mock_data()
+        if journal_path:
+            valid_length = self.replay_journal(journal_path)
+            self._journal = GroupCommitJournal(journal_path, valid_length)
+    
+    @contextmanager
+    def transaction(self):
+        """Apply a group of changes as one unit
+
+        Changes made inside the block are rolled back if it raises. On success
+        they are written to the journal (if any); the fsync is shared with any
+        other transactions committing at the same time. If the journal write
+        fails, the changes are rolled back and the error is raised; once the
+        journal has failed, new transactions are refused before they start.
+        """
+        with self._lock:
+            if self._journal is not None:
+                self._journal.check()
+            txn = Transaction()
+            try:
+                yield txn
+                changes = txn.changes()
+                ticket = self._journal.submit(changes) if self._journal and changes else None
+            except BaseException:
+                txn.rollback()
+                raise
+            if ticket is not None:
+                self._unsynced[ticket] = txn
+        
+        # Wait for durability outside the lock so concurrent commits share a flush
+        if ticket is not None:
+            try:
+                self._journal.wait(ticket)
+            except BaseException:
+                self._rollback_unsynced()
+                raise
+            with self._lock:
+                self._unsynced.pop(ticket, None)
+    
+    def _rollback_unsynced(self):
+        """Undo every transaction that did not reach the journal, newest first"""
+        with self._lock:
+            durable = self._journal.durable
+            for ticket in sorted(self._unsynced, reverse=True):
+                if ticket > durable:
+                    self._unsynced[ticket].rollback()
+            self._unsynced.clear()
+    
+    def replay_journal(self, journal_path: str) -> int:
+        """Re-apply committed changes from a journal file
+
+        Returns the byte length of the complete commits in the file.
+        """
+        loaders = {
+            'employees': self.load_employees,
+            'leave_requests': self.load_leave_requests,
+            'leave_balance': self.load_leave_balances,
+        }
+        return GroupCommitJournal.replay(journal_path, lambda dataset, record: loaders[dataset]([record]))
+    
+    def enable_profiling(self):
+        """Start tracemalloc and count allocations per public method"""
+        if self.profiler is None:
+            from leave_profiler import AllocationProfiler
+            self.profiler = AllocationProfiler()
+            self.profiler.instrument(self)
+        self.profiler.start()
+        return self.profiler
+    
+    def disable_profiling(self):
+        """Stop profiling and restore the unwrapped methods"""
+        if self.profiler is not None:
+            self.profiler.stop()
+            self.profiler.uninstrument(self)
+            self.profiler = None
+    
+    def close(self):
+        """Flush and close the journal"""
+        if self._journal:
+            self._journal.close()
+            self._journal = None
     
     def initialize_mock_data(self):
         """Initialize the system with mock data"""
@@ -44,21 +183,20 @@ class LeaveManagementSystem:
                 print(f"Employee with ID {employee_id} already exists!")
                 return False
             
-            # Add new employee
-            self.employees[employee_id] = {
-                'id': employee_id,
-                'name': name,
-                'department': department,
-                'position': position,
-                'email': email,
-                'phone': phone,
-                'join_date': join_date,
-                'leave_entitlement': leave_entitlement
-            }
-            
-            # Initialize leave balance for the employee
-            current_year = date.today().year
-            self.initialize_leave_balance(employee_id, name, leave_entitlement, current_year)
+            with self.transaction() as txn:
+                # Add new employee
+                self.employees[employee_id] = {
+                    'id': employee_id,
+                    'name': name,
+                    'department': department,
+                    'position': position,
+                    'email': email,
+                    'phone': phone,
+                    'join_date': join_date,
+                    'leave_entitlement': leave_entitlement
+                }
+                txn.record_insert('employees', self.employees, employee_id)
+                # Leave balances are derived from the policy until first used
             
             print(f"Employee {name} added successfully with {leave_entitlement} days leave entitlement!")
             return True
@@ -67,48 +205,46 @@ class LeaveManagementSystem:
             print(f"Error adding employee: {e}")
             return False
     
-    def initialize_leave_balance(self, employee_id: str, employee_name: str, entitlement: int, year: int):
-        """Initialize leave balance for different leave types"""
-        leave_types = ["Annual Leave", "Sick Leave", "Personal Leave", "Maternity Leave", "Paternity Leave"]
-        
-        if employee_id not in self.leave_balance:
-            self.leave_balance[employee_id] = {}
+    def _default_balance(self, employee: Dict, leave_type: str, year: int = None) -> Dict:
+        """Build an unused balance record from the leave policy"""
+        total_entitlement = self.policy.get(leave_type).entitlement_for(employee)
+        return {
+            'employee_id': employee['id'],
+            'employee_name': employee['name'],
+            'leave_type': leave_type,
+            'total_entitlement': total_entitlement,
+            'used_leaves': 0,
+            'remaining_leaves': total_entitlement,
+            'year': year or date.today().year
+        }
+    
+    def get_balance(self, employee_id: str, leave_type: str) -> Optional[Dict]:
+        """Stored balance, or one derived from the policy, or None if not entitled"""
+        stored = self.leave_balance.get(employee_id)
+        if stored and leave_type in stored:
+            return stored[leave_type]
         
-        for leave_type in leave_types:
-            # Set different entitlements for different leave types
-            if leave_type == "Annual Leave":
-                total_entitlement = entitlement
-            elif leave_type == "Sick Leave":
-                total_entitlement = 15
-            elif leave_type == "Personal Leave":
-                total_entitlement = 5
-            elif leave_type == "Maternity Leave":
-                total_entitlement = 90
-            elif leave_type == "Paternity Leave":
-                total_entitlement = 15
-            
-            self.leave_balance[employee_id][leave_type] = {
-                'employee_id': employee_id,
-                'employee_name': employee_name,
-                'leave_type': leave_type,
-                'total_entitlement': total_entitlement,
-                'used_leaves': 0,
-                'remaining_leaves': total_entitlement,
-                'year': year
-            }
+        employee = self.employees.get(employee_id)
+        policy = self.policy.get(leave_type)
+        if employee is None or policy is None or not policy.is_eligible(employee):
+            return None
+        return self._default_balance(employee, leave_type)
     
     def apply_leave(self, employee_id: str, leave_type: str, start_date: str, end_date: str, 
                    reason: str = "") -> bool:
         """Apply for leave"""
+        return self.submit_leave_request(employee_id, leave_type, start_date, end_date, reason) is not None
+    
+    def submit_leave_request(self, employee_id: str, leave_type: str, start_date: str, end_date: str,
+                             reason: str = "") -> Optional[str]:
+        """Apply for leave and return the new request ID, or None if the request is invalid"""
         try:
-            # Normalize leave type (case-insensitive)
-            leave_type = leave_type.strip().title()
-            
-            # Validate leave type
-            valid_leave_types = ["Annual Leave", "Sick Leave", "Personal Leave", "Maternity Leave", "Paternity Leave"]
-            if leave_type not in valid_leave_types:
-                print(f"Invalid leave type! Please choose from: {', '.join(valid_leave_types)}")
-                return False
+            # Validate leave type and normalize it to the policy's spelling (case-insensitive)
+            canonical_type = self.policy.resolve(leave_type)
+            if canonical_type is None:
+                print(f"Invalid leave type! Please choose from: {', '.join(self.policy.leave_types())}")
+                return None
+            leave_type = canonical_type
             
             # Try multiple date formats
             start_dt = None
@@ -132,57 +268,60 @@ class LeaveManagementSystem:
             
             if start_dt is None or end_dt is None:
                 print("Invalid date format! Please use YYYY-MM-DD, DD/MM/YYYY, or DD-MM-YYYY")
-                return False
+                return None
             
             if start_dt > end_dt:
                 print("Start date cannot be after end date!")
-                return False
+                return None
             
             if start_dt < date.today():
                 print("Cannot apply for leave in the past!")
-                return False
+                return None
             
             # Calculate total days (excluding weekends)
             total_days = self.calculate_working_days(start_dt, end_dt)
             
             # Check leave balance
             if not self.check_leave_balance(employee_id, leave_type, total_days):
-                return False
+                return None
             
             # Get employee name
             employee_name = self.get_employee_name(employee_id)
             if not employee_name:
                 print(f"Employee with ID {employee_id} not found!")
-                return False
+                return None
             
-            # Generate request ID
-            request_id = f"LR{self.request_counter:03d}"
-            self.request_counter += 1
-            
-            # Add leave request
-            self.leave_requests[request_id] = {
-                'request_id': request_id,
-                'employee_id': employee_id,
-                'employee_name': employee_name,
-                'leave_type': leave_type,
-                'start_date': start_dt.strftime("%Y-%m-%d"),
-                'end_date': end_dt.strftime("%Y-%m-%d"),
-                'total_days': total_days,
-                'reason': reason,
-                'status': 'Pending',
-                'applied_date': datetime.now().strftime("%Y-%m-%d"),
-                'approved_by': None,
-                'approved_date': None,
-                'comments': None
-            }
+            with self.transaction() as txn:
+                # Generate request ID
+                request_id = f"LR{self.request_counter:03d}"
+                txn.record_attr(self, 'request_counter')
+                self.request_counter += 1
+                
+                # Add leave request
+                self.leave_requests[request_id] = {
+                    'request_id': request_id,
+                    'employee_id': employee_id,
+                    'employee_name': employee_name,
+                    'leave_type': leave_type,
+                    'start_date': start_dt.strftime("%Y-%m-%d"),
+                    'end_date': end_dt.strftime("%Y-%m-%d"),
+                    'total_days': total_days,
+                    'reason': reason,
+                    'status': 'Pending',
+                    'applied_date': datetime.now().strftime("%Y-%m-%d"),
+                    'approved_by': None,
+                    'approved_date': None,
+                    'comments': None
+                }
+                txn.record_insert('leave_requests', self.leave_requests, request_id)
             
             print(f"Leave request submitted successfully! Request ID: {request_id}")
             print(f"Leave Type: {leave_type}, Duration: {total_days} days")
-            return True
+            return request_id
             
         except Exception as e:
             print(f"Error applying for leave: {e}")
-            return False
+            return None
     
     def calculate_working_days(self, start_date: date, end_date: date) -> int:
         """Calculate working days excluding weekends"""
@@ -199,8 +338,9 @@ class LeaveManagementSystem:
     def check_leave_balance(self, employee_id: str, leave_type: str, requested_days: int) -> bool:
         """Check if employee has sufficient leave balance"""
         try:
-            if employee_id in self.leave_balance and leave_type in self.leave_balance[employee_id]:
-                remaining_leaves = self.leave_balance[employee_id][leave_type]['remaining_leaves']
+            balance = self.get_balance(employee_id, leave_type)
+            if balance is not None:
+                remaining_leaves = balance['remaining_leaves']
                 if remaining_leaves >= requested_days:
                     return True
                 else:
@@ -223,22 +363,30 @@ class LeaveManagementSystem:
     def approve_leave(self, request_id: str, approved_by: str, status: str = "Approved", comments: str = "") -> bool:
         """Approve or reject leave request"""
         try:
-            if request_id not in self.leave_requests:
-                print(f"Leave request {request_id} not found!")
-                return False
-            
-            # Update status
-            self.leave_requests[request_id]['status'] = status
-            self.leave_requests[request_id]['approved_by'] = approved_by
-            self.leave_requests[request_id]['approved_date'] = datetime.now().strftime("%Y-%m-%d")
-            self.leave_requests[request_id]['comments'] = comments
-            
-            # If approved, update leave balance
-            if status == "Approved":
-                employee_id = self.leave_requests[request_id]['employee_id']
-                leave_type = self.leave_requests[request_id]['leave_type']
-                total_days = self.leave_requests[request_id]['total_days']
-                self.update_leave_balance(employee_id, leave_type, total_days)
+            # Checks run inside the transaction (under the lock) so concurrent
+            # decisions on the same request cannot both apply
+            with self.transaction() as txn:
+                request = self.leave_requests.get(request_id)
+                if request is None:
+                    print(f"Leave request {request_id} not found!")
+                    return False
+                if request['status'] != "Pending":
+                    print(f"Leave request {request_id} is already {request['status'].lower()}!")
+                    return False
+                
+                # Status and balance change commit together or not at all
+                txn.record_update('leave_requests', request)
+                
+                # Update status
+                request['status'] = status
+                request['approved_by'] = approved_by
+                request['approved_date'] = datetime.now().strftime("%Y-%m-%d")
+                request['comments'] = comments
+                
+                # If approved, update leave balance
+                if status == "Approved":
+                    self._adjust_leave_balance(txn, request['employee_id'], request['leave_type'],
+                                               request['total_days'])
             
             print(f"Leave request {request_id} {status.lower()}")
             return True
@@ -250,89 +398,221 @@ class LeaveManagementSystem:
     def update_leave_balance(self, employee_id: str, leave_type: str, used_days: int):
         """Update leave balance after leave approval"""
         try:
-            if employee_id in self.leave_balance and leave_type in self.leave_balance[employee_id]:
-                current_used = self.leave_balance[employee_id][leave_type]['used_leaves']
-                current_remaining = self.leave_balance[employee_id][leave_type]['remaining_leaves']
-                
-                new_used = current_used + used_days
-                new_remaining = current_remaining - used_days
-                
-                self.leave_balance[employee_id][leave_type]['used_leaves'] = new_used
-                self.leave_balance[employee_id][leave_type]['remaining_leaves'] = new_remaining
-                
-                print(f"Updated leave balance for {leave_type}: Used {new_used}, Remaining {new_remaining}")
+            if self.get_balance(employee_id, leave_type) is not None:
+                with self.transaction() as txn:
+                    self._adjust_leave_balance(txn, employee_id, leave_type, used_days)
                 
         except Exception as e:
             print(f"Error updating leave balance: {e}")
     
+    def _adjust_leave_balance(self, txn: Transaction, employee_id: str, leave_type: str, used_days: int):
+        """Move used_days from remaining to used within a transaction (negative restores)
+
+        Materializes the balance on first use. Raises KeyError if the employee
+        is not entitled to the leave type so the enclosing transaction rolls back.
+        """
+        balance = self.get_balance(employee_id, leave_type)
+        if balance is None:
+            raise KeyError(f"No leave balance for {employee_id} - {leave_type}")
+        
+        emp_balances = self.leave_balance.get(employee_id)
+        if emp_balances is not None and emp_balances.get(leave_type) is balance:
+            txn.record_update('leave_balance', balance)
+        else:
+            # First use: store the derived balance (and the employee's dict if needed)
+            if emp_balances is None:
+                emp_balances = self.leave_balance[employee_id] = {}
+                txn.record_insert(None, self.leave_balance, employee_id)
+            emp_balances[leave_type] = balance
+            txn.record_insert('leave_balance', emp_balances, leave_type)
+        
+        balance['used_leaves'] += used_days
+        balance['remaining_leaves'] -= used_days
+        
+        action = "Updated" if used_days >= 0 else "Restored"
+        print(f"{action} leave balance for {leave_type}: Used {balance['used_leaves']}, "
+              f"Remaining {balance['remaining_leaves']}")
+    
     def get_leave_requests(self, employee_id: str = None, status: str = None) -> List[Dict]:
         """Get leave requests with optional filtering"""
         try:
-            requests = list(self.leave_requests.values())
-            
-            # Apply filters
-            if employee_id:
-                requests = [req for req in requests if req['employee_id'] == employee_id]
-            
-            if status:
-                requests = [req for req in requests if req['status'] == status]
-            
-            return requests
+            return list(self.iter_leave_requests(employee_id=employee_id, status=status))
             
         except Exception as e:
             print(f"Error getting leave requests: {e}")
             return []
     
+    def iter_leave_requests(self, employee_id: str = None, status: str = None) -> Iterator[Dict]:
+        """Yield leave requests one at a time with optional filtering"""
+        for req in self.leave_requests.values():
+            if employee_id and req['employee_id'] != employee_id:
+                continue
+            if status and req['status'] != status:
+                continue
+            yield req
+    
     def get_leave_balance(self, employee_id: str = None) -> List[Dict]:
         """Get leave balance for employees"""
         try:
-            if employee_id:
-                if employee_id in self.leave_balance:
-                    return list(self.leave_balance[employee_id].values())
-                else:
-                    return []
-            else:
-                # Return all balances
-                all_balances = []
-                for emp_balances in self.leave_balance.values():
-                    all_balances.extend(emp_balances.values())
-                return all_balances
+            return list(self.iter_leave_balance(employee_id=employee_id))
                 
         except Exception as e:
             print(f"Error getting leave balance: {e}")
             return []
     
+    def iter_leave_balance(self, employee_id: str = None) -> Iterator[Dict]:
+        """Yield leave balance records one at a time, deriving unused ones from the policy"""
+        if employee_id:
+            yield from self._iter_employee_balances(employee_id)
+        else:
+            for emp_id in self.employees:
+                yield from self._iter_employee_balances(emp_id)
+            # Balances loaded for employees that are not (yet) in the system
+            for emp_id in self.leave_balance:
+                if emp_id not in self.employees:
+                    yield from self._iter_employee_balances(emp_id)
+    
+    def _iter_employee_balances(self, employee_id: str) -> Iterator[Dict]:
+        stored = self.leave_balance.get(employee_id, {})
+        employee = self.employees.get(employee_id)
+        if employee is None:
+            yield from stored.values()
+            return
+        
+        for policy in self.policy:
+            if policy.name in stored:
+                yield stored[policy.name]
+            elif policy.is_eligible(employee):
+                yield self._default_balance(employee, policy.name)
+        # Balances for leave types since removed from the policy
+        for leave_type, balance in stored.items():
+            if leave_type not in self.policy:
+                yield balance
+    
     def get_employee_list(self) -> List[Dict]:
         """Get list of all employees"""
         try:
-            return list(self.employees.values())
+            return list(self.iter_employees())
         except Exception as e:
             print(f"Error getting employee list: {e}")
             return []
     
+    def iter_employees(self) -> Iterator[Dict]:
+        """Yield employee records one at a time"""
+        yield from self.employees.values()
+    
+    def load_employees(self, records: Iterable[Dict], first_row: int = 1) -> Tuple[int, int]:
+        """Insert a batch of employee records as one transaction
+
+        Invalid rows and existing IDs are skipped individually. Returns
+        (loaded, rejected); first_row numbers the rows in messages.
+        """
+        loaded = rejected = 0
+        with self.transaction() as txn:
+            for row, record in enumerate(records, first_row):
+                reason = _invalid_record_reason(record, EMPLOYEE_REQUIRED)
+                if reason is None and record['id'] in self.employees:
+                    reason = f"employee {record['id']} already exists"
+                if reason:
+                    print(f"Skipping employee row {row}: {reason}")
+                    rejected += 1
+                    continue
+                employee = dict(record)
+                for field in EMPLOYEE_OPTIONAL:
+                    if employee.get(field) is None:
+                        employee[field] = ""
+                self.employees[record['id']] = employee
+                txn.record_insert('employees', self.employees, record['id'])
+                loaded += 1
+        return loaded, rejected
+    
+    def load_leave_requests(self, records: Iterable[Dict], first_row: int = 1) -> Tuple[int, int]:
+        """Insert a batch of leave request records as-is (no balance changes) as one transaction
+
+        Invalid rows are skipped individually. Returns (loaded, rejected).
+        """
+        loaded = rejected = 0
+        with self.transaction() as txn:
+            for row, record in enumerate(records, first_row):
+                reason = _invalid_record_reason(record, REQUEST_REQUIRED)
+                if reason:
+                    print(f"Skipping leave request row {row}: {reason}")
+                    rejected += 1
+                    continue
+                request_id = record['request_id']
+                txn.record_set('leave_requests', self.leave_requests, request_id)
+                self.leave_requests[request_id] = dict(record)
+                # Keep generated IDs ahead of imported ones
+                if request_id.startswith("LR") and request_id[2:].isdigit():
+                    txn.record_attr(self, 'request_counter')
+                    self.request_counter = max(self.request_counter, int(request_id[2:]) + 1)
+                loaded += 1
+        return loaded, rejected
+    
+    def load_leave_balances(self, records: Iterable[Dict], first_row: int = 1) -> Tuple[int, int]:
+        """Insert or replace a batch of leave balance records as one transaction
+
+        Invalid rows are skipped individually. Returns (loaded, rejected).
+        """
+        loaded = rejected = 0
+        with self.transaction() as txn:
+            for row, record in enumerate(records, first_row):
+                reason = _invalid_record_reason(record, BALANCE_REQUIRED)
+                if reason:
+                    print(f"Skipping leave balance row {row}: {reason}")
+                    rejected += 1
+                    continue
+                employee_id = record['employee_id']
+                if self._is_derived_balance(record):
+                    # Unused balances stay derived from the policy, e.g. on re-import of an export
+                    loaded += 1
+                    continue
+                if employee_id not in self.leave_balance:
+                    txn.record_set(None, self.leave_balance, employee_id)
+                    self.leave_balance[employee_id] = {}
+                emp_balances = self.leave_balance[employee_id]
+                txn.record_set('leave_balance', emp_balances, record['leave_type'])
+                emp_balances[record['leave_type']] = dict(record)
+                loaded += 1
+        return loaded, rejected
+    
+    def _is_derived_balance(self, record: Dict) -> bool:
+        """Whether a balance record matches the policy default and nothing is stored for it"""
+        if record['leave_type'] in self.leave_balance.get(record['employee_id'], {}):
+            return False
+        employee = self.employees.get(record['employee_id'])
+        policy = self.policy.get(record['leave_type'])
+        if employee is None or policy is None or not policy.is_eligible(employee):
+            return False
+        return dict(record) == self._default_balance(employee, record['leave_type'])
+    
     def cancel_leave(self, request_id: str, employee_id: str) -> bool:
         """Cancel a leave request"""
         try:
-            if request_id not in self.leave_requests:
-                print(f"Leave request {request_id} not found!")
-                return False
-            
-            request = self.leave_requests[request_id]
-            if request['employee_id'] != employee_id:
-                print(f"Leave request {request_id} not authorized for this employee!")
-                return False
-            
-            current_status = request['status']
-            
-            if current_status == "Approved":
-                # If already approved, restore leave balance
-                leave_type = request['leave_type']
-                total_days = request['total_days']
-                self.restore_leave_balance(employee_id, leave_type, total_days)
-            
-            # Update status to cancelled
-            request['status'] = "Cancelled"
-            request['comments'] = "Cancelled by employee"
+            # Checks run inside the transaction (under the lock) so two cancels
+            # of an approved request cannot both restore the balance
+            with self.transaction() as txn:
+                request = self.leave_requests.get(request_id)
+                if request is None:
+                    print(f"Leave request {request_id} not found!")
+                    return False
+                if request['employee_id'] != employee_id:
+                    print(f"Leave request {request_id} not authorized for this employee!")
+                    return False
+                if request['status'] == "Cancelled":
+                    print(f"Leave request {request_id} is already cancelled!")
+                    return False
+                
+                # Balance restore and status change commit together or not at all
+                if request['status'] == "Approved":
+                    # If already approved, restore leave balance
+                    self._adjust_leave_balance(txn, employee_id, request['leave_type'],
+                                               -request['total_days'])
+                
+                # Update status to cancelled
+                txn.record_update('leave_requests', request)
+                request['status'] = "Cancelled"
+                request['comments'] = "Cancelled by employee"
             
             print(f"Leave request {request_id} cancelled successfully")
             return True
@@ -344,17 +624,9 @@ class LeaveManagementSystem:
     def restore_leave_balance(self, employee_id: str, leave_type: str, days: int):
         """Restore leave balance when leave is cancelled"""
         try:
-            if employee_id in self.leave_balance and leave_type in self.leave_balance[employee_id]:
-                current_used = self.leave_balance[employee_id][leave_type]['used_leaves']
-                current_remaining = self.leave_balance[employee_id][leave_type]['remaining_leaves']
-                
-                new_used = current_used - days
-                new_remaining = current_remaining + days
-                
-                self.leave_balance[employee_id][leave_type]['used_leaves'] = new_used
-                self.leave_balance[employee_id][leave_type]['remaining_leaves'] = new_remaining
-                
-                print(f"Restored leave balance for {leave_type}: Used {new_used}, Remaining {new_remaining}")
+            if self.get_balance(employee_id, leave_type) is not None:
+                with self.transaction() as txn:
+                    self._adjust_leave_balance(txn, employee_id, leave_type, -days)
                 
         except Exception as e:
             print(f"Error restoring leave balance: {e}")
@@ -425,11 +697,10 @@ class LeaveManagementSystem:
         
         # Display leave balance
         print(f"\n💰 LEAVE BALANCE:")
-        for emp_id, balances in self.leave_balance.items():
-            emp_name = self.employees[emp_id]['name']
-            print(f"  📋 {emp_name}:")
-            for leave_type, balance in balances.items():
-                print(f"    • {leave_type}: {balance['remaining_leaves']}/{balance['total_entitlement']} days remaining")
+        for emp_id, emp in self.employees.items():
+            print(f"  📋 {emp['name']}:")
+            for balance in self.iter_leave_balance(emp_id):
+                print(f"    • {balance['leave_type']}: {balance['remaining_leaves']}/{balance['total_entitlement']} days remaining")
         
         print("\n" + "="*60)
 
@@ -511,7 +782,7 @@ def main():
             emp_input = input("Employee ID, Name, or Number (e.g., 1, EMP001, vibhanshu): ").strip()
             emp_id = leave_mgr.get_employee_id_from_input(emp_input)
             
-            print(f"\nAvailable Leave Types: Annual Leave, Sick Leave, Personal Leave, Maternity Leave, Paternity Leave")
+            print(f"\nAvailable Leave Types: {', '.join(leave_mgr.policy.leave_types())}")
             leave_type = input("Leave Type: ").strip()
             start_date = input("Start Date (YYYY-MM-DD, DD/MM/YYYY, or DD-MM-YYYY): ").strip()
             end_date = input("End Date (YYYY-MM-DD, DD/MM/YYYY, or DD-MM-YYYY): ").strip()
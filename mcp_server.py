@@ -4,23 +4,40 @@ Leave Management System MCP Server
 For use with Claude Desktop using FastMCP
 """
 
+import os
+import sys
+import tracemalloc
+import anyio
 from fastmcp import FastMCP
 from main import LeaveManagementSystem
 from typing import Optional
+import leave_io
+from leave_forecast import forecast_availability, DEFAULT_SHORTAGE_THRESHOLD
+import leave_profiler
 
 # Create the FastMCP server instance that Claude Desktop expects
 mcp = FastMCP("leave-management")
 
-# Initialize the leave management system
-leave_mgr = LeaveManagementSystem()
+# Initialize the leave management system (set LEAVE_JOURNAL_PATH to persist changes,
+# LEAVE_POLICY_PATH to use a different leave policy file)
+leave_mgr = LeaveManagementSystem(
+    journal_path=os.environ.get("LEAVE_JOURNAL_PATH"),
+    policy_path=os.environ.get("LEAVE_POLICY_PATH")
+)
 
-@mcp.tool()
-def view_employees() -> str:
-    """View all employees in the system"""
-    employees = leave_mgr.get_employee_list()
-    if not employees:
-        return "No employees found in the system."
-    
+# Export/import tools only touch files under this directory
+EXPORT_DIR = os.path.realpath(os.environ.get(
+    "LEAVE_EXPORT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "exports")))
+
+def resolve_export_path(path: str) -> str:
+    """Resolve a tool-supplied path inside EXPORT_DIR, rejecting anything outside it"""
+    resolved = os.path.realpath(os.path.join(EXPORT_DIR, path))
+    if os.path.commonpath([EXPORT_DIR, resolved]) != EXPORT_DIR or resolved == EXPORT_DIR:
+        raise ValueError(f"Path '{path}' is outside the export directory {EXPORT_DIR}")
+    return resolved
+
+def format_employees(employees) -> str:
+    """Render employee records as the view_employees text"""
     result = "👥 **EMPLOYEES**\n\n"
     for emp in employees:
         result += f"**{emp['name']}** ({emp['id']})\n"
@@ -30,8 +47,45 @@ def view_employees() -> str:
         result += f"  Leave Entitlement: {emp['leave_entitlement']} days\n\n"
     return result
 
+def format_leave_requests(requests) -> str:
+    """Render leave requests as the view_leave_requests text"""
+    result = "📝 **LEAVE REQUESTS**\n\n"
+    for req in requests:
+        status_icon = "✅" if req['status'] == 'Approved' else "⏳" if req['status'] == 'Pending' else "❌"
+        result += f"{status_icon} **{req['request_id']}**\n"
+        result += f"  Employee: {req['employee_name']}\n"
+        result += f"  Leave Type: {req['leave_type']}\n"
+        result += f"  Dates: {req['start_date']} to {req['end_date']} ({req['total_days']} days)\n"
+        result += f"  Status: {req['status']}\n"
+        if req['reason']:
+            result += f"  Reason: {req['reason']}\n"
+        result += "\n"
+    return result
+
+def format_leave_balance(balances) -> str:
+    """Render balance records as the view_leave_balance text"""
+    result = "💰 **LEAVE BALANCE**\n\n"
+    for balance in balances:
+        result += f"**{balance['employee_name']}** - {balance['leave_type']}\n"
+        result += f"  Total: {balance['total_entitlement']} days\n"
+        result += f"  Used: {balance['used_leaves']} days\n"
+        result += f"  Remaining: {balance['remaining_leaves']} days\n\n"
+    return result
+
+@mcp.tool()
+def view_employees() -> str:
+    """View all employees in the system"""
+    employees = leave_mgr.get_employee_list()
+    if not employees:
+        return "No employees found in the system."
+    return format_employees(employees)
+
+# Write tools are async and run the leave_mgr call in a worker thread. A sync
+# tool would run on the event loop and block the server through its own fsync;
+# overlapping transactions instead share a journal flush (group commit).
+
 @mcp.tool()
-def add_employee(
+async def add_employee(
     employee_id: str,
     name: str,
     department: str,
@@ -41,16 +95,16 @@ def add_employee(
     leave_entitlement: int = 25
 ) -> str:
     """Add a new employee to the system"""
-    success = leave_mgr.add_employee(
-        employee_id, name, department, position, email, phone, leave_entitlement
-    )
+    success = await anyio.to_thread.run_sync(lambda: leave_mgr.add_employee(
+        employee_id, name, department, position, email, phone, leave_entitlement=leave_entitlement
+    ))
     if success:
         return f"✅ Employee {name} added successfully!"
     else:
         return f"❌ Failed to add employee {name}"
 
 @mcp.tool()
-def apply_leave(
+async def apply_leave(
     employee_id: str,
     leave_type: str,
     start_date: str,
@@ -58,24 +112,24 @@ def apply_leave(
     reason: str = ""
 ) -> str:
     """Apply for leave for an employee"""
-    success = leave_mgr.apply_leave(
-        employee_id, leave_type, start_date, end_date, reason
+    request_id = await anyio.to_thread.run_sync(
+        leave_mgr.submit_leave_request, employee_id, leave_type, start_date, end_date, reason
     )
-    if success:
-        return "✅ Leave request submitted successfully!"
+    if request_id:
+        return f"✅ Leave request {request_id} submitted successfully!"
     else:
         return "❌ Failed to submit leave request"
 
 @mcp.tool()
-def approve_leave(
+async def approve_leave(
     request_id: str,
     approver: str,
     status: str,
     comments: str = ""
 ) -> str:
     """Approve or reject a leave request"""
-    success = leave_mgr.approve_leave(
-        request_id, approver, status, comments
+    success = await anyio.to_thread.run_sync(
+        leave_mgr.approve_leave, request_id, approver, status, comments
     )
     if success:
         return f"✅ Leave request {request_id} {status.lower()}"
@@ -93,19 +147,7 @@ def view_leave_requests(
     )
     if not requests:
         return "No leave requests found."
-    
-    result = "📝 **LEAVE REQUESTS**\n\n"
-    for req in requests:
-        status_icon = "✅" if req['status'] == 'Approved' else "⏳" if req['status'] == 'Pending' else "❌"
-        result += f"{status_icon} **{req['request_id']}**\n"
-        result += f"  Employee: {req['employee_name']}\n"
-        result += f"  Leave Type: {req['leave_type']}\n"
-        result += f"  Dates: {req['start_date']} to {req['end_date']} ({req['total_days']} days)\n"
-        result += f"  Status: {req['status']}\n"
-        if req['reason']:
-            result += f"  Reason: {req['reason']}\n"
-        result += "\n"
-    return result
+    return format_leave_requests(requests)
 
 @mcp.tool()
 def view_leave_balance(employee_id: Optional[str] = None) -> str:
@@ -113,13 +155,22 @@ def view_leave_balance(employee_id: Optional[str] = None) -> str:
     balances = leave_mgr.get_leave_balance(employee_id=employee_id)
     if not balances:
         return "No leave balance found."
-    
-    result = "💰 **LEAVE BALANCE**\n\n"
-    for balance in balances:
-        result += f"**{balance['employee_name']}** - {balance['leave_type']}\n"
-        result += f"  Total: {balance['total_entitlement']} days\n"
-        result += f"  Used: {balance['used_leaves']} days\n"
-        result += f"  Remaining: {balance['remaining_leaves']} days\n\n"
+    return format_leave_balance(balances)
+
+@mcp.tool()
+def view_leave_policies() -> str:
+    """View configured leave types, entitlements and eligibility rules"""
+    result = "📅 **LEAVE POLICIES**\n\n"
+    for policy in leave_mgr.policy:
+        entitlement = "employee entitlement" if policy.entitlement == "employee" else f"{policy.entitlement} days"
+        result += f"**{policy.name}**: {entitlement}\n"
+        for department, days in policy.department_overrides.items():
+            result += f"  {department}: {days} days\n"
+        if policy.eligible_departments is not None:
+            result += f"  Eligible departments: {', '.join(sorted(policy.eligible_departments))}\n"
+        if policy.min_service_days:
+            result += f"  Minimum service: {policy.min_service_days} days\n"
+        result += "\n"
     return result
 
 @mcp.tool()
@@ -140,14 +191,143 @@ def get_leave_summary(year: Optional[int] = None) -> str:
     return result
 
 @mcp.tool()
-def cancel_leave(request_id: str, employee_id: str) -> str:
+def forecast_staffing(
+    months: int = 3,
+    department: Optional[str] = None,
+    threshold: float = DEFAULT_SHORTAGE_THRESHOLD
+) -> str:
+    """Forecast weeks where a department's projected availability drops below threshold (0-1)"""
+    try:
+        forecast = forecast_availability(leave_mgr, months=months)
+    except ValueError as e:
+        return f"❌ Failed to forecast staffing: {e}"
+    shortages = forecast.short_staffed_weeks(threshold, department=department)
+    scope = department or "all departments"
+    if not shortages:
+        return f"✅ No short-staffed weeks forecast for {scope} in the next {months} months."
+    
+    result = f"📉 **STAFFING FORECAST ({scope}, next {months} months)**\n\n"
+    for week in shortages:
+        result += f"⚠️ Week of {week['week_start']} - {week['department']}\n"
+        result += f"  Available: {week['min_available']}/{week['headcount']} ({week['availability']}%)\n"
+    return result
+
+@mcp.tool()
+def memory_profile(action: str = "report") -> str:
+    """Per-method allocation counters; action is report (read-only), enable, disable or reset"""
+    if action not in ("report", "enable", "disable", "reset"):
+        return f"❌ Invalid action '{action}'. Use report, enable, disable or reset."
+    if action == "enable":
+        leave_mgr.enable_profiling()
+    elif action == "disable":
+        leave_mgr.disable_profiling()
+        return "✅ Profiling disabled and methods restored."
+    
+    profiler = leave_mgr.profiler
+    if profiler is None:
+        return "Profiling is off. Set LEAVE_PROFILE=1 or call with action=enable."
+    
+    current, peak = tracemalloc.get_traced_memory()
+    result = "🧠 **MEMORY PROFILE**\n\n"
+    result += f"Traced memory: {current} bytes (peak {peak} bytes)\n"
+    result += f"Employees: {len(leave_mgr.employees)}, Requests: {len(leave_mgr.leave_requests)}\n\n"
+    for row in profiler.report():
+        result += f"**{row['method']}**: {row['calls']} calls, "
+        result += f"net {row['net_bytes']} bytes, peak {row['peak_bytes']} bytes\n"
+    if action == "reset":
+        profiler.reset()
+    return result
+
+# profile_memory_at_scale blocks the server while it runs (tracemalloc is
+# process-wide, so it cannot overlap other calls); this bounds the total work
+MAX_PROFILE_EMPLOYEES = 10000
+
+@mcp.tool()
+def profile_memory_at_scale(scales: str = "100,1000", top: int = 10) -> str:
+    """Profile memory per employee/request and top allocation sites at synthetic scales"""
+    try:
+        scale_list = [int(s) for s in scales.split(",") if s.strip()]
+    except ValueError:
+        return f"❌ Invalid scales '{scales}'. Use comma-separated employee counts, e.g. 100,1000"
+    if not scale_list or min(scale_list) < 1 or sum(scale_list) > MAX_PROFILE_EMPLOYEES:
+        return (f"❌ Invalid scales '{scales}'. Use positive employee counts totalling at most "
+                f"{MAX_PROFILE_EMPLOYEES}; run leave_profiler.py for larger scales")
+    
+    # Include the MCP text rendering, which builds large strings
+    workload = {
+        'format_leave_requests': lambda mgr: format_leave_requests(mgr.get_leave_requests()),
+        'format_leave_balance': lambda mgr: format_leave_balance(mgr.get_leave_balance()),
+        'format_employees': lambda mgr: format_employees(mgr.get_employee_list()),
+    }
+    results = leave_profiler.profile_scale(scale_list, top=top, workload=workload)
+    return "🧠 **MEMORY PROFILE AT SCALE**\n\n" + leave_profiler.format_profile(results)
+
+@mcp.tool()
+async def cancel_leave(request_id: str, employee_id: str) -> str:
     """Cancel a leave request"""
-    success = leave_mgr.cancel_leave(request_id, employee_id)
+    success = await anyio.to_thread.run_sync(leave_mgr.cancel_leave, request_id, employee_id)
     if success:
         return f"✅ Leave request {request_id} cancelled successfully"
     else:
         return f"❌ Failed to cancel leave request"
 
+@mcp.tool()
+def export_leave_data(dataset: str, path: str, file_format: str = "csv") -> str:
+    """Stream employees, leave_requests or leave_balance to a CSV/JSONL file in the export directory (.gz compresses)"""
+    try:
+        path = resolve_export_path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if file_format.lower() == "jsonl":
+            count = leave_io.export_jsonl(leave_mgr, dataset, path)
+        else:
+            count = leave_io.export_csv(leave_mgr, dataset, path)
+        return f"✅ Exported {count} {dataset} records to {path}"
+    except Exception as e:
+        return f"❌ Failed to export {dataset}: {e}"
+
+@mcp.tool()
+async def import_leave_data(dataset: str, path: str, file_format: str = "csv") -> str:
+    """Stream employees, leave_requests or leave_balance from a CSV/JSONL file in the export directory in batches"""
+    try:
+        path = resolve_export_path(path)
+        import_file = leave_io.import_jsonl if file_format.lower() == "jsonl" else leave_io.import_csv
+        loaded, rejected = await anyio.to_thread.run_sync(import_file, leave_mgr, dataset, path)
+        if rejected:
+            return f"⚠️ Imported {loaded} {dataset} records from {path}; rejected {rejected} invalid rows"
+        return f"✅ Imported {loaded} {dataset} records from {path}"
+    except Exception as e:
+        return f"❌ Failed to import {dataset}: {e}"
+
+class StatusToStderr:
+    """sys.stdout for the stdio transport
+
+    stdout carries the JSON-RPC stream (stdio_server wraps sys.stdout.buffer),
+    so the status messages leave_mgr prints from worker threads go to stderr
+    instead of being interleaved with protocol frames.
+    """
+
+    def __init__(self, stdout, stderr):
+        self.buffer = stdout.buffer
+        self._stderr = stderr
+
+    def write(self, text: str) -> int:
+        return self._stderr.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self._stderr, name)
+
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Leave Management System MCP Server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    
     # Run the FastMCP server
-    mcp.run()
+    if args.transport == "http":
+        mcp.run(transport="streamable-http", host=args.host, port=args.port)
+    else:
+        sys.stdout = StatusToStderr(sys.stdout, sys.stderr)
+        mcp.run()
@@ -0,0 +1,64 @@
+"""
+Tests for the staffing-availability forecast.
+"""
+
+import contextlib
+import io
+import unittest
+from datetime import date
+
+from leave_forecast import forecast_availability
+from main import LeaveManagementSystem
+
+
+class ForecastTests(unittest.TestCase):
+    def setUp(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.leave_mgr = LeaveManagementSystem()
+            self.leave_mgr.employees.clear()
+            self.leave_mgr.leave_requests.clear()
+            self.leave_mgr.leave_balance.clear()
+            self.leave_mgr.load_employees([
+                {'id': f"HR{n}", 'name': f"hr {n}", 'department': "HR",
+                 'join_date': "2024-01-01", 'leave_entitlement': 25}
+                for n in range(2)
+            ])
+
+    def load_requests(self, requests):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.leave_mgr.load_leave_requests(requests)
+
+    def test_sparse_history_is_measured_over_the_observed_period(self):
+        # One 5-day leave in Nov 2025; the two employees have been around since Jan 2024
+        self.load_requests([{
+            'request_id': "LR001", 'employee_id': "HR0", 'employee_name': "hr 0",
+            'leave_type': "Sick Leave", 'start_date': "2025-11-10", 'end_date': "2025-11-14",
+            'total_days': 5, 'status': "Approved", 'applied_date': "2025-11-01",
+        }])
+
+        forecast = forecast_availability(self.leave_mgr, months=12, start=date(2026, 1, 5))
+        hr = forecast.departments.index("HR")
+        sick = forecast.leave_types.index("Sick Leave")
+
+        # 5 days over 2 people x 41 November working days (2024 and 2025), not 5 / (2 x 5)
+        self.assertAlmostEqual(forecast.historical_rates[hr, sick, 10], 5 / 82)
+        self.assertEqual(forecast.short_staffed_weeks(), [])
+
+    def test_months_outside_range_raise(self):
+        for months in (0, -1, 1000):
+            with self.assertRaises(ValueError):
+                forecast_availability(self.leave_mgr, months=months)
+
+    def test_non_iso_dates_are_rejected_on_load(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            loaded = self.leave_mgr.load_leave_requests([{
+                'request_id': "LR002", 'employee_id': "HR0", 'employee_name': "hr 0",
+                'leave_type': "Sick Leave", 'start_date': "02/11/2026", 'end_date': "2026-11-03",
+                'total_days': 1, 'status': "Approved",
+            }])
+        self.assertEqual(loaded, (0, 1))
+        forecast_availability(self.leave_mgr, months=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
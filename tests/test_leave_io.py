@@ -0,0 +1,58 @@
+"""
+Tests for streaming export and import.
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+import leave_io
+from main import LeaveManagementSystem
+
+
+class ImportExportTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._quiet = contextlib.redirect_stdout(io.StringIO())
+        self._quiet.__enter__()
+
+    def tearDown(self):
+        self._quiet.__exit__(None, None, None)
+        self._tmp.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self._tmp.name, name)
+
+    def test_balance_round_trip_keeps_unused_balances_derived(self):
+        leave_mgr = LeaveManagementSystem()
+        day = date.today() + timedelta(days=30)
+        while day.weekday() > 4:
+            day += timedelta(days=1)
+        self.assertTrue(leave_mgr.apply_leave("EMP001", "Sick Leave", str(day), str(day)))
+        self.assertTrue(leave_mgr.approve_leave(f"LR{leave_mgr.request_counter - 1:03d}", "Manager"))
+
+        for export, import_file, name in ((leave_io.export_csv, leave_io.import_csv, "balance.csv"),
+                                          (leave_io.export_jsonl, leave_io.import_jsonl, "balance.jsonl")):
+            exported = export(leave_mgr, 'leave_balance', self.path(name))
+            restored = LeaveManagementSystem()
+            self.assertEqual(import_file(restored, 'leave_balance', self.path(name)), (exported, 0))
+            self.assertEqual(sum(len(balances) for balances in restored.leave_balance.values()), 1)
+            self.assertEqual(restored.get_leave_balance(), leave_mgr.get_leave_balance())
+
+    def test_unparseable_csv_numbers_reject_only_their_row(self):
+        with open(self.path("employees.csv"), "w", encoding="utf-8") as f:
+            f.write("id,name,department,position,email,phone,join_date,leave_entitlement\n"
+                    "A1,a,IT,Dev,a@x,1,2024-01-01,--5\n"
+                    "A2,b,IT,Dev,b@x,1,2024-01-01,²\n"
+                    "A3,c,IT,Dev,c@x,1,2024-01-01,20\n")
+        leave_mgr = LeaveManagementSystem()
+
+        self.assertEqual(leave_io.import_csv(leave_mgr, 'employees', self.path("employees.csv")), (1, 2))
+        self.assertEqual(leave_mgr.employees["A3"]['leave_entitlement'], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Regression tests for transactions, the group-commit journal and batch loading.
+
+Run from the repository root with:
+
+    python -m unittest discover tests
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+import leave_store
+from leave_store import GroupCommitJournal
+from main import LeaveManagementSystem
+
+
+def next_working_day(days_ahead: int = 30) -> str:
+    day = date.today() + timedelta(days=days_ahead)
+    while day.weekday() > 4:
+        day += timedelta(days=1)
+    return day.strftime("%Y-%m-%d")
+
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self._tmp.name, "journal.jsonl")
+        # The system reports progress with print(); keep test output readable
+        self._quiet = contextlib.redirect_stdout(io.StringIO())
+        self._quiet.__enter__()
+        self.systems = []
+
+    def tearDown(self):
+        for leave_mgr in self.systems:
+            leave_mgr.close()
+        self._quiet.__exit__(None, None, None)
+        self._tmp.cleanup()
+
+    def open_system(self) -> LeaveManagementSystem:
+        leave_mgr = LeaveManagementSystem(journal_path=self.journal_path)
+        self.systems.append(leave_mgr)
+        return leave_mgr
+
+    def reopen_system(self) -> LeaveManagementSystem:
+        for leave_mgr in self.systems:
+            leave_mgr.close()
+        self.systems = []
+        return self.open_system()
+
+    def apply(self, leave_mgr: LeaveManagementSystem, employee_id: str = "EMP001",
+              leave_type: str = "Sick Leave") -> str:
+        day = next_working_day()
+        self.assertTrue(leave_mgr.apply_leave(employee_id, leave_type, day, day, "test"))
+        return f"LR{leave_mgr.request_counter - 1:03d}"
+
+
+class ReplayTests(JournalTestCase):
+    def test_round_trip(self):
+        leave_mgr = self.open_system()
+        self.assertTrue(leave_mgr.add_employee("EMP900", "replay", "IT", "Dev", "r@x", "1"))
+        request_id = self.apply(leave_mgr, "EMP900")
+        self.assertTrue(leave_mgr.approve_leave(request_id, "Manager"))
+        counter = leave_mgr.request_counter
+
+        restarted = self.reopen_system()
+        self.assertIn("EMP900", restarted.employees)
+        self.assertEqual(restarted.leave_requests[request_id]['status'], "Approved")
+        balance = restarted.get_balance("EMP900", "Sick Leave")
+        self.assertEqual(balance['used_leaves'], 1)
+        self.assertEqual(balance['remaining_leaves'], balance['total_entitlement'] - 1)
+        self.assertEqual(restarted.request_counter, counter)
+
+    def test_torn_last_line_is_ignored_and_truncated(self):
+        leave_mgr = self.open_system()
+        self.assertTrue(leave_mgr.add_employee("EMP901", "kept", "IT", "Dev", "k@x", "1"))
+        leave_mgr.close()
+        complete = os.path.getsize(self.journal_path)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write('{"changes": [["employees", {"id": "EMP9')
+
+        applied = []
+        self.assertEqual(GroupCommitJournal.replay(self.journal_path, lambda ds, rec: applied.append(rec)),
+                         complete)
+        self.assertEqual([rec['id'] for rec in applied], ["EMP901"])
+
+        # A commit after the restart starts on a clean line and survives the next one
+        restarted = self.reopen_system()
+        self.assertTrue(restarted.add_employee("EMP902", "after", "HR", "Dev", "a@x", "1"))
+        final = self.reopen_system()
+        self.assertIn("EMP901", final.employees)
+        self.assertIn("EMP902", final.employees)
+
+    def test_corrupt_middle_line_raises(self):
+        lines = [
+            json.dumps({'changes': [['employees', {'id': 'A'}]]}),
+            '{"changes": [[',
+            json.dumps({'changes': [['employees', {'id': 'B'}]]}),
+        ]
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+        with self.assertRaises(ValueError):
+            GroupCommitJournal.replay(self.journal_path, lambda ds, rec: None)
+
+
+class RollbackTests(JournalTestCase):
+    def test_fsync_failure_rolls_back_every_unsynced_transaction(self):
+        leave_mgr = self.open_system()
+        request_id = self.apply(leave_mgr)
+        counter = leave_mgr.request_counter
+        balance = dict(leave_mgr.get_balance("EMP001", "Sick Leave"))
+
+        # Hold the first flush until every writer has submitted, then fail it
+        release = threading.Event()
+
+        def failing_fsync(fd):
+            release.wait(5)
+            raise OSError("disk full")
+
+        day = next_working_day()
+        threads = [threading.Thread(target=leave_mgr.approve_leave, args=(request_id, "Manager"))]
+        threads += [threading.Thread(target=leave_mgr.apply_leave,
+                                     args=(f"EMP00{n}", "Sick Leave", day, day, "test"))
+                    for n in range(2, 6)]
+        with mock.patch.object(leave_store.os, "fsync", failing_fsync):
+            for thread in threads:
+                thread.start()
+            deadline = time.monotonic() + 5
+            while len(leave_mgr._unsynced) < len(threads) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(len(leave_mgr._unsynced), len(threads))
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(leave_mgr.leave_requests[request_id]['status'], "Pending")
+        self.assertEqual(leave_mgr.get_balance("EMP001", "Sick Leave"), balance)
+        self.assertEqual(list(leave_mgr.leave_requests), [request_id])
+        self.assertEqual(leave_mgr.request_counter, counter)
+        self.assertEqual(leave_mgr._unsynced, {})
+
+        # Once the journal has failed, new writes are refused
+        self.assertFalse(leave_mgr.add_employee("EMP903", "late", "IT", "Dev", "l@x", "1"))
+        self.assertNotIn("EMP903", leave_mgr.employees)
+
+    def test_exception_in_body_rolls_back_half_applied_approve(self):
+        leave_mgr = self.open_system()
+        request_id = self.apply(leave_mgr)
+        before = dict(leave_mgr.leave_requests[request_id])
+
+        # The status is already changed when the balance update fails
+        with mock.patch.object(leave_mgr, "_adjust_leave_balance", side_effect=RuntimeError("boom")):
+            self.assertFalse(leave_mgr.approve_leave(request_id, "Manager"))
+
+        self.assertEqual(leave_mgr.leave_requests[request_id], before)
+        self.assertNotIn("EMP001", leave_mgr.leave_balance)
+        restarted = self.reopen_system()
+        self.assertEqual(restarted.leave_requests[request_id]['status'], "Pending")
+
+
+class LoadValidationTests(JournalTestCase):
+    def test_invalid_rows_are_skipped_individually(self):
+        leave_mgr = self.open_system()
+        rows = [{'id': f"IMP{n}", 'name': f"imported {n}", 'department': "IT",
+                 'join_date': "2024-01-01", 'leave_entitlement': 20} for n in range(4)]
+        rows[1]['leave_entitlement'] = "twenty"
+        rows[2] = {'id': "IMP2"}
+
+        self.assertEqual(leave_mgr.load_employees(rows), (2, 2))
+        self.assertEqual(leave_mgr.employees["IMP0"]['position'], "")
+
+        restarted = self.reopen_system()
+        self.assertIn("IMP0", restarted.employees)
+        self.assertIn("IMP3", restarted.employees)
+        self.assertNotIn("IMP1", restarted.employees)
+
+
+if __name__ == "__main__":
+    unittest.main()